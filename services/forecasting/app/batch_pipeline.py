@@ -0,0 +1,227 @@
+"""Memory-bounded batch forecasting pipeline"""
+import json
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.models import ForecastRequest, ForecastResponse
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+BatchItem = Tuple[Optional[ForecastResponse], Optional[dict]]
+
+
+def get_batch_window_size() -> int:
+    """Get the number of batch requests kept in flight from environment"""
+    return max(1, int(os.getenv("BATCH_WINDOW_SIZE", "5")))
+
+
+def get_rss_bytes() -> int:
+    """Get current resident set size of this process in bytes"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    if resource is None:
+        return 0
+
+    # Fall back to peak RSS (kilobytes on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageMemoryTracker:
+    """Tracks RSS at the boundaries of each pipeline stage"""
+
+    def __init__(self):
+        self.stages: Dict[str, dict] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        before = get_rss_bytes()
+        try:
+            yield
+        finally:
+            after = get_rss_bytes()
+            stats = self.stages.setdefault(
+                name, {"calls": 0, "peak_rss_bytes": 0, "max_delta_bytes": 0}
+            )
+            stats["calls"] += 1
+            stats["peak_rss_bytes"] = max(stats["peak_rss_bytes"], before, after)
+            stats["max_delta_bytes"] = max(stats["max_delta_bytes"], after - before)
+
+    def summary(self) -> Dict[str, dict]:
+        """Per-stage memory usage in megabytes"""
+        return {
+            name: {
+                "calls": stats["calls"],
+                "peak_rss_mb": round(stats["peak_rss_bytes"] / (1024 * 1024), 2),
+                "max_delta_mb": round(stats["max_delta_bytes"] / (1024 * 1024), 2),
+            }
+            for name, stats in self.stages.items()
+        }
+
+
+def _json_field(name: str, value) -> str:
+    """Serialize a single `"name": value` member of a JSON object"""
+    return f"{json.dumps(name)}: {json.dumps(value)}"
+
+
+def _error_item(idx: int, request: ForecastRequest, error: str) -> dict:
+    return {
+        "index": idx,
+        "region": request.region,
+        "district": request.district,
+        "disease": request.disease,
+        "error": error
+    }
+
+
+def iter_batch_forecasts(
+    requests: List[ForecastRequest],
+    data_access,
+    forecast_service,
+    window_size: Optional[int] = None,
+    tracker: Optional[StageMemoryTracker] = None
+) -> Iterator[BatchItem]:
+    """
+    Fetch, forecast and emit batch requests in bounded windows
+
+    At most `window_size` fetched histories are held at once. Histories
+    fetched from the database are released as soon as their forecast has
+    been generated, so peak memory depends on the window, not the batch size.
+
+    Args:
+        requests: Forecast requests to process
+        data_access: DataAccess instance, or None if the database is unavailable
+        forecast_service: ForecastService used to generate forecasts
+        window_size: Number of requests in flight (default: BATCH_WINDOW_SIZE)
+        tracker: Optional tracker recording memory usage per stage
+
+    Yields:
+        Tuples of (forecast, None) on success or (None, error details) on failure
+    """
+    window_size = window_size or get_batch_window_size()
+    tracker = tracker or StageMemoryTracker()
+
+    for start in range(0, len(requests), window_size):
+        window = list(enumerate(requests[start:start + window_size], start=start))
+        ready = []
+        failed = []
+
+        with tracker.stage("fetch"):
+            for idx, request in window:
+                if request.historical_data is not None:
+                    ready.append((idx, request, False))
+                    continue
+
+                if data_access is None:
+                    failed.append(_error_item(
+                        idx, request,
+                        "Database not available. Please provide historical_data in the request."
+                    ))
+                    continue
+
+                try:
+                    historical_data = data_access.fetch_historical_cases(
+                        region=request.region,
+                        district=request.district,
+                        state=request.state,
+                        disease=request.disease,
+                        days=request.historical_days
+                    )
+                except Exception as e:
+                    logger.error(f"Error processing request {idx}: {str(e)}")
+                    failed.append(_error_item(idx, request, str(e)))
+                    continue
+
+                if len(historical_data) < 7:
+                    failed.append(_error_item(
+                        idx, request,
+                        f"Insufficient historical data: {len(historical_data)} days"
+                    ))
+                    continue
+
+                request.historical_data = historical_data
+                ready.append((idx, request, True))
+
+        for error in failed:
+            yield None, error
+
+        for idx, request, fetched in ready:
+            try:
+                with tracker.stage("forecast"):
+                    forecast = forecast_service.generate_forecast(request)
+            except Exception as e:
+                logger.error(f"Error processing request {idx}: {str(e)}")
+                forecast = None
+                error = _error_item(idx, request, str(e))
+            finally:
+                if fetched:
+                    request.historical_data = None
+
+            if forecast is None:
+                yield None, error
+                continue
+
+            with tracker.stage("emit"):
+                yield forecast, None
+
+
+def stream_batch_response(
+    requests: List[ForecastRequest],
+    data_access,
+    forecast_service,
+    window_size: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Stream the batch forecast JSON body as forecasts complete
+
+    Forecasts are serialized and released one at a time; only the small
+    error details are accumulated until the end of the body. The status code
+    is sent before any work runs, so a failure that aborts the batch is
+    reported in an "error" field and the document is still closed.
+    """
+    tracker = StageMemoryTracker()
+    success = 0
+    errors = []
+    failure = None
+
+    yield '{"forecasts": ['
+    try:
+        for forecast, error in iter_batch_forecasts(
+            requests, data_access, forecast_service, window_size, tracker
+        ):
+            if error is not None:
+                errors.append(error)
+                continue
+            yield ("," if success else "") + forecast.model_dump_json()
+            success += 1
+    except Exception as e:
+        logger.error(f"Batch forecast error: {str(e)}", exc_info=True)
+        failure = f"Batch forecast failed: {str(e)}"
+
+    memory = tracker.summary()
+    logger.info(
+        f"Batch forecast complete: {success} succeeded, {len(errors)} failed, "
+        f"memory by stage: {memory}"
+    )
+
+    fields = [
+        _json_field("success", success),
+        _json_field("errors", len(errors)),
+        _json_field("error_details", errors),
+        _json_field("memory", memory),
+    ]
+    if failure is not None:
+        fields.append(_json_field("error", failure))
+    yield "], " + ", ".join(fields) + "}"
@@ -1,11 +1,12 @@
 """Data access layer for fetching historical case data from MongoDB"""
 import logging
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from pymongo.collection import Collection
 
 from app.db import get_db
 from app.models import HistoricalCase
+from app.region_catalog import RegionCatalog
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +17,7 @@ class DataAccess:
     def __init__(self):
         self.db = get_db()
         self.cases_collection: Collection = self.db.cases
+        self.region_catalog = RegionCatalog(self.db)
 
     def fetch_historical_cases(
         self,
@@ -93,56 +95,53 @@ class DataAccess:
             logger.error(f"Error fetching historical cases: {str(e)}", exc_info=True)
             raise ValueError(f"Failed to fetch historical data: {str(e)}")
 
-    def get_available_regions(self, disease: Optional[str] = None) -> List[dict]:
+    def ensure_indexes(self):
+        """Ensure indexes supporting case lookups and the region catalog exist"""
+        self.region_catalog.ensure_indexes()
+
+    def get_available_regions(
+        self,
+        disease: Optional[str] = None,
+        state: Optional[str] = None,
+        region: Optional[str] = None,
+        min_cases: int = 0,
+        limit: int = 100,
+        offset: int = 0
+    ) -> Tuple[List[dict], int]:
         """
-        Get list of available regions with case data
+        Get list of available regions with case data from the region catalog
+        
+        The catalog is kept up to date by a background refresh, so this only
+        runs an indexed query on the summary collection.
         
         Args:
             disease: Optional disease filter
+            state: Optional state filter
+            region: Optional region filter
+            min_cases: Minimum number of case records per region/disease
+            limit: Maximum number of regions to return
+            offset: Number of regions to skip
             
         Returns:
-            List of dictionaries with region, district, state, disease info
+            Tuple of (list of dictionaries with region, district, state, disease,
+            latest_date and case_count, total number of matching regions)
         """
         try:
-            query = {}
-            if disease:
-                query["disease"] = disease
-            
-            # Use aggregation to get distinct combinations
-            pipeline = [
-                {"$match": query},
-                {
-                    "$group": {
-                        "_id": {
-                            "region": "$region",
-                            "district": "$district",
-                            "state": "$state",
-                            "disease": "$disease"
-                        },
-                        "latest_date": {"$max": "$date"},
-                        "case_count": {"$sum": 1}
-                    }
-                },
-                {
-                    "$project": {
-                        "_id": 0,
-                        "region": "$_id.region",
-                        "district": "$_id.district",
-                        "state": "$_id.state",
-                        "disease": "$_id.disease",
-                        "latest_date": 1,
-                        "case_count": 1
-                    }
-                },
-                {"$sort": {"region": 1, "district": 1}}
-            ]
-            
-            results = list(self.cases_collection.aggregate(pipeline))
-            logger.info(f"Found {len(results)} available region/disease combinations")
+            results, total = self.region_catalog.list_regions(
+                disease=disease,
+                state=state,
+                region=region,
+                min_cases=min_cases,
+                limit=limit,
+                offset=offset
+            )
+            logger.info(
+                f"Found {total} available region/disease combinations "
+                f"(returning {len(results)})"
+            )
             
-            return results
+            return results, total
             
         except Exception as e:
             logger.error(f"Error fetching available regions: {str(e)}", exc_info=True)
-            return []
-
+            return [], 0
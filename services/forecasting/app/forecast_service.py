@@ -1,11 +1,19 @@
+import hashlib
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional, Tuple
 
 import pandas as pd
 import numpy as np
 
-from app.models import ForecastRequest, ForecastResponse, ForecastPoint, HistoricalCase
+from app.models import (
+    ForecastRequest, ForecastResponse, ForecastPoint, HistoricalCase, MAX_FORECAST_DAYS
+)
+from app import profiling
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +31,11 @@ class ForecastService:
 
     def __init__(self):
         self.model_version = "1.0.0"
+        # Full-horizon forecasts keyed by series fingerprint: key -> (created_at, forecast)
+        self._path_cache: "OrderedDict[str, Tuple[float, ForecastResponse]]" = OrderedDict()
+        self._path_cache_size = int(os.getenv("FORECAST_CACHE_SIZE", "256"))
+        self._path_cache_ttl = float(os.getenv("FORECAST_CACHE_TTL_SECONDS", "3600"))
+        self._path_cache_lock = threading.Lock()
 
     def calculate_risk_score(self, forecast_points: List[ForecastPoint], historical_avg: float) -> float:
         """Calculate overall risk score based on forecast trends"""
@@ -145,20 +158,99 @@ class ForecastService:
             raise ValueError(f"Failed to generate forecast: {str(e)}")
 
     def generate_forecast(self, request: ForecastRequest) -> ForecastResponse:
-        """Generate forecast using Prophet model or fallback to simple method"""
+        """
+        Generate forecast for the requested horizon
+
+        The model is fitted once at MAX_FORECAST_DAYS and the full forecast path
+        is cached per series and historical data, so any shorter horizon on the
+        same data is served by slicing the cached path.
+        """
         # Validate historical data
         if request.historical_data is None or len(request.historical_data) < 7:
             raise ValueError("At least 7 days of historical data is required")
         
+        cache_key = self._path_cache_key(request)
+        # Profiled requests always fit so the profile captures the model work
+        full_forecast = None if profiling.is_active() else self._get_cached_path(cache_key)
+        if full_forecast is None:
+            full_request = request.model_copy(update={"forecast_days": MAX_FORECAST_DAYS})
+            full_forecast, cacheable = self._fit_forecast(full_request)
+            if cacheable:
+                self._store_cached_path(cache_key, full_forecast)
+        else:
+            logger.info(
+                f"Serving {request.forecast_days}-day forecast for "
+                f"{request.region}/{request.district} from cached forecast path"
+            )
+        
+        return self._slice_forecast(request, full_forecast)
+
+    def _fit_forecast(self, request: ForecastRequest) -> Tuple[ForecastResponse, bool]:
+        """
+        Fit Prophet model or fallback to simple method
+
+        Returns:
+            Tuple of (forecast, whether it may be cached). Fallback results are
+            not cached when Prophet is available, so the next request retries it.
+        """
         # Try Prophet first if available
         if PROPHET_AVAILABLE:
             try:
-                return self._generate_prophet_forecast(request)
+                return self._generate_prophet_forecast(request), True
             except Exception as e:
                 logger.warning(f"Prophet forecast failed: {str(e)}. Falling back to simple method.")
-                return self.generate_simple_forecast(request)
-        else:
-            return self.generate_simple_forecast(request)
+        
+        with profiling.stage("simple_forecast"):
+            return self.generate_simple_forecast(request), not PROPHET_AVAILABLE
+
+    def _slice_forecast(self, request: ForecastRequest, full_forecast: ForecastResponse) -> ForecastResponse:
+        """Cut a full-horizon forecast to the requested horizon, recomputing risk and confidence"""
+        forecast_points = full_forecast.forecast_points[:request.forecast_days]
+        historical_avg = float(np.mean([case.cases for case in request.historical_data]))
+        
+        risk_score = self.calculate_risk_score(forecast_points, historical_avg)
+        risk_level = self.determine_risk_level(risk_score)
+        confidence = self.calculate_confidence(request.historical_data)
+        
+        return full_forecast.model_copy(update={
+            "forecast_date": datetime.now(),
+            "forecast_points": forecast_points,
+            "risk_score": round(risk_score, 3),
+            "risk_level": risk_level,
+            "confidence": round(confidence, 3)
+        })
+
+    def _path_cache_key(self, request: ForecastRequest) -> str:
+        """Fingerprint a series and its historical data"""
+        digest = hashlib.sha256()
+        digest.update(
+            f"{request.region}|{request.district}|{request.state}|{request.disease}".encode()
+        )
+        for case in request.historical_data:
+            digest.update(
+                f"|{case.date.isoformat()},{case.cases},{case.temperature},"
+                f"{case.humidity},{case.rainfall}".encode()
+            )
+        return digest.hexdigest()
+
+    def _get_cached_path(self, key: str) -> Optional[ForecastResponse]:
+        with self._path_cache_lock:
+            entry = self._path_cache.get(key)
+            if entry is None:
+                return None
+            created_at, forecast = entry
+            if time.monotonic() - created_at > self._path_cache_ttl:
+                del self._path_cache[key]
+                return None
+            self._path_cache.move_to_end(key)
+            return forecast
+
+    def _store_cached_path(self, key: str, forecast: ForecastResponse):
+        with self._path_cache_lock:
+            self._path_cache[key] = (time.monotonic(), forecast)
+            self._path_cache.move_to_end(key)
+            while len(self._path_cache) > self._path_cache_size:
+                self._path_cache.popitem(last=False)
 
     def _generate_prophet_forecast(self, request: ForecastRequest) -> ForecastResponse:
         """Generate forecast using Prophet model"""
@@ -193,7 +285,9 @@ class ForecastService:
                 historical_df['temperature'] = [case.temperature or historical_df['y'].mean() 
                                                 for case in request.historical_data]
 
-            model.fit(historical_df)
+            with profiling.stage("prophet_fit"):
+                model.fit(historical_df)
+            profiling.record_stan_iterations(model)
 
             # Create future dataframe
             future = model.make_future_dataframe(periods=request.forecast_days)
@@ -204,7 +298,8 @@ class ForecastService:
                 future['temperature'] = last_temp
 
             # Generate forecast
-            forecast = model.predict(future)
+            with profiling.stage("prophet_predict"):
+                forecast = model.predict(future)
 
             # Extract only future predictions (last forecast_days rows)
             future_forecast = forecast.tail(request.forecast_days)
@@ -1,11 +1,16 @@
 import os
 import logging
-from fastapi import FastAPI, HTTPException
+from contextlib import nullcontext
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
 from app.models import ForecastRequest, ForecastResponse, BatchForecastRequest
 from app.forecast_service import ForecastService
 from app.data_access import DataAccess
+from app.batch_pipeline import stream_batch_response
+from app import profiling
 from app.db import connect_db, close_db
 
 # Configure logging
@@ -44,10 +49,19 @@ def create_app() -> FastAPI:
         except Exception as e:
             logger.warning(f"Database connection failed: {str(e)}. Service will continue but DB features may not work.")
             data_access = None
+            return
+
+        try:
+            data_access.ensure_indexes()
+            data_access.region_catalog.start_background_refresh()
+        except Exception as e:
+            logger.warning(f"Region catalog initialization failed: {str(e)}")
 
     @app.on_event("shutdown")
     async def shutdown_event():
         """Close database connection on shutdown"""
+        if data_access is not None:
+            data_access.region_catalog.stop_background_refresh()
         close_db()
         logger.info("Application shutdown complete")
 
@@ -79,54 +93,85 @@ def create_app() -> FastAPI:
             }
 
     @app.post("/forecast", response_model=ForecastResponse, tags=["forecasting"])
-    async def generate_forecast(request: ForecastRequest):
+    async def generate_forecast(
+        request: ForecastRequest,
+        response: Response,
+        profile: bool = False,
+        x_profile: Optional[str] = Header(default=None),
+        x_admin_token: Optional[str] = Header(default=None)
+    ):
         """
         Generate disease outbreak forecast for a region
         
         If historical_data is not provided, it will be fetched from MongoDB.
         Requires at least 7 days of historical data. Returns forecast for the specified
         number of days (default 14, max 30) with risk scores and confidence intervals.
+        
+        Admins can profile a single request with `?profile=true` or an `X-Profile: 1`
+        header plus `X-Admin-Token`. The profile is stored and its id is returned in
+        the `X-Profile-Id` response header for download from `/profiles/{profile_id}`.
         """
-        try:
-            logger.info(f"Generating forecast for {request.region}/{request.district}, {request.disease}")
+        profile_context = nullcontext()
+        if profile or profiling.is_enabled_flag(x_profile):
+            if not profiling.is_admin(x_admin_token):
+                raise HTTPException(status_code=403, detail="Profiling requires a valid admin token")
+            profile_context = profiling.RequestProfile(
+                label=f"forecast {request.region}/{request.district}/{request.disease}"
+            )
+
+        with profile_context as request_profile:
+            profile_headers = (
+                {"X-Profile-Id": request_profile.profile_id} if request_profile is not None else None
+            )
+            try:
+                logger.info(f"Generating forecast for {request.region}/{request.district}, {request.disease}")
             
-            # Fetch historical data from DB if not provided
-            if request.historical_data is None:
-                if data_access is None:
-                    raise HTTPException(
-                        status_code=503,
-                        detail="Database not available. Please provide historical_data in the request."
-                    )
+                # Fetch historical data from DB if not provided
+                if request.historical_data is None:
+                    if data_access is None:
+                        raise HTTPException(
+                            status_code=503,
+                            detail="Database not available. Please provide historical_data in the request.",
+                            headers=profile_headers
+                        )
                 
-                logger.info(f"Fetching historical data from database ({request.historical_days} days)")
-                historical_data = data_access.fetch_historical_cases(
-                    region=request.region,
-                    district=request.district,
-                    state=request.state,
-                    disease=request.disease,
-                    days=request.historical_days
-                )
+                    logger.info(f"Fetching historical data from database ({request.historical_days} days)")
+                    with profiling.stage("fetch_history"):
+                        historical_data = data_access.fetch_historical_cases(
+                            region=request.region,
+                            district=request.district,
+                            state=request.state,
+                            disease=request.disease,
+                            days=request.historical_days
+                        )
                 
-                if len(historical_data) < 7:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Insufficient historical data. Found {len(historical_data)} days, minimum 7 days required."
-                    )
+                    if len(historical_data) < 7:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"Insufficient historical data. Found {len(historical_data)} days, minimum 7 days required.",
+                            headers=profile_headers
+                        )
                 
-                # Update request with fetched data
-                request.historical_data = historical_data
+                    # Update request with fetched data
+                    request.historical_data = historical_data
             
-            forecast = forecast_service.generate_forecast(request)
-            return forecast
+                forecast = forecast_service.generate_forecast(request)
+                if profile_headers:
+                    response.headers.update(profile_headers)
+                return forecast
             
-        except HTTPException:
-            raise
-        except ValueError as e:
-            logger.error(f"Validation error: {str(e)}")
-            raise HTTPException(status_code=400, detail=str(e))
-        except Exception as e:
-            logger.error(f"Unexpected error: {str(e)}", exc_info=True)
-            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+            except HTTPException:
+                raise
+            except ValueError as e:
+                logger.error(f"Validation error: {str(e)}")
+                raise HTTPException(status_code=400, detail=str(e), headers=profile_headers)
+            except Exception as e:
+                logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Internal server error: {str(e)}",
+                    headers=profile_headers
+                )
 
     @app.post("/forecast/batch", tags=["forecasting"])
     async def batch_forecast(batch_request: BatchForecastRequest):
@@ -134,78 +179,31 @@ def create_app() -> FastAPI:
         Batch forecasting endpoint
         
         Process multiple forecast requests at once (max 50 requests).
-        Returns forecasts for all requested regions/diseases.
+        Requests are fetched and forecast in bounded windows (BATCH_WINDOW_SIZE)
+        and forecasts are streamed back as they complete, so memory use does
+        not grow with the batch size.
         """
-        try:
-            logger.info(f"Processing batch forecast with {len(batch_request.requests)} requests")
-            
-            results = []
-            errors = []
-            
-            for idx, request in enumerate(batch_request.requests):
-                try:
-                    # Fetch historical data from DB if not provided
-                    if request.historical_data is None:
-                        if data_access is None:
-                            errors.append({
-                                "index": idx,
-                                "region": request.region,
-                                "district": request.district,
-                                "disease": request.disease,
-                                "error": "Database not available. Please provide historical_data in the request."
-                            })
-                            continue
-                        
-                        historical_data = data_access.fetch_historical_cases(
-                            region=request.region,
-                            district=request.district,
-                            state=request.state,
-                            disease=request.disease,
-                            days=request.historical_days
-                        )
-                        
-                        if len(historical_data) < 7:
-                            errors.append({
-                                "index": idx,
-                                "region": request.region,
-                                "district": request.district,
-                                "disease": request.disease,
-                                "error": f"Insufficient historical data: {len(historical_data)} days"
-                            })
-                            continue
-                        
-                        request.historical_data = historical_data
-                    
-                    forecast = forecast_service.generate_forecast(request)
-                    results.append(forecast)
-                    
-                except Exception as e:
-                    logger.error(f"Error processing request {idx}: {str(e)}")
-                    errors.append({
-                        "index": idx,
-                        "region": request.region,
-                        "district": request.district,
-                        "disease": request.disease,
-                        "error": str(e)
-                    })
-            
-            return {
-                "success": len(results),
-                "errors": len(errors),
-                "forecasts": results,
-                "error_details": errors
-            }
-            
-        except Exception as e:
-            logger.error(f"Batch forecast error: {str(e)}", exc_info=True)
-            raise HTTPException(status_code=500, detail=f"Batch forecast failed: {str(e)}")
+        logger.info(f"Processing batch forecast with {len(batch_request.requests)} requests")
+        
+        return StreamingResponse(
+            stream_batch_response(batch_request.requests, data_access, forecast_service),
+            media_type="application/json"
+        )
 
     @app.get("/regions", tags=["data"])
-    async def get_available_regions(disease: str = None):
+    async def get_available_regions(
+        disease: str = None,
+        state: str = None,
+        region: str = None,
+        min_cases: int = Query(default=0, ge=0),
+        limit: int = Query(default=100, ge=1, le=1000),
+        offset: int = Query(default=0, ge=0)
+    ):
         """
         Get list of available regions with case data
         
-        Optionally filter by disease type.
+        Served from the region catalog. Optionally filter by disease, state,
+        region and minimum case count; results are paginated with limit/offset.
         """
         try:
             if data_access is None:
@@ -214,9 +212,19 @@ def create_app() -> FastAPI:
                     detail="Database not available"
                 )
             
-            regions = data_access.get_available_regions(disease=disease)
+            regions, total = data_access.get_available_regions(
+                disease=disease,
+                state=state,
+                region=region,
+                min_cases=min_cases,
+                limit=limit,
+                offset=offset
+            )
             return {
                 "count": len(regions),
+                "total": total,
+                "limit": limit,
+                "offset": offset,
                 "regions": regions
             }
         except HTTPException:
@@ -225,6 +233,46 @@ def create_app() -> FastAPI:
             logger.error(f"Error fetching regions: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Failed to fetch regions: {str(e)}")
 
+    @app.get("/profiles", tags=["system"])
+    async def list_profiles(x_admin_token: Optional[str] = Header(default=None)):
+        """List stored request profiles (admin only)"""
+        if not profiling.is_admin(x_admin_token):
+            raise HTTPException(status_code=403, detail="Admin token required")
+        
+        profiles = profiling.profile_store.list()
+        return {
+            "count": len(profiles),
+            "profiles": profiles
+        }
+
+    @app.get("/profiles/{profile_id}", tags=["system"])
+    async def get_profile(
+        profile_id: str,
+        output_format: str = Query(default="json", alias="format", pattern="^(json|pstats)$"),
+        top: int = Query(default=40, ge=1, le=500),
+        x_admin_token: Optional[str] = Header(default=None)
+    ):
+        """
+        Download a stored request profile (admin only)
+        
+        `format=json` returns stage timings, Stan iteration counts and the top
+        cProfile entries; `format=pstats` returns the raw profile for pstats/snakeviz.
+        """
+        if not profiling.is_admin(x_admin_token):
+            raise HTTPException(status_code=403, detail="Admin token required")
+        
+        stored = profiling.profile_store.get(profile_id)
+        if stored is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        
+        if output_format == "pstats":
+            return Response(
+                content=stored.stats_bytes(),
+                media_type="application/octet-stream",
+                headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'}
+            )
+        return stored.to_dict(top=top)
+
     return app
 
 
@@ -2,6 +2,9 @@ from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, Field
 
+# Longest forecast horizon served; forecasts are fitted once at this horizon
+MAX_FORECAST_DAYS = 30
+
 
 class HistoricalCase(BaseModel):
     """Historical case data point"""
@@ -19,7 +22,7 @@ class ForecastRequest(BaseModel):
     state: str = Field(..., description="State name")
     disease: str = Field(..., description="Disease type")
     historical_data: Optional[List[HistoricalCase]] = Field(default=None, description="Historical case data (optional, will fetch from DB if not provided)")
-    forecast_days: int = Field(default=14, ge=1, le=30, description="Number of days to forecast (1-30)")
+    forecast_days: int = Field(default=14, ge=1, le=MAX_FORECAST_DAYS, description=f"Number of days to forecast (1-{MAX_FORECAST_DAYS})")
     historical_days: int = Field(default=90, ge=7, le=365, description="Number of days of history to fetch from DB (if historical_data not provided)")
 
 
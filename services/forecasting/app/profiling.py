@@ -0,0 +1,230 @@
+"""On-demand per-request profiling (cProfile, stage timings, Stan iterations)"""
+import cProfile
+import hmac
+import io
+import logging
+import marshal
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Profile of the request currently executing, None when profiling is off
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "current_profile", default=None
+)
+
+# CmdStan optimizer console output: L-BFGS/BFGS table rows and Newton lines
+_LBFGS_HEADER_LINE = re.compile(r"^\s*Iter\s")
+_LBFGS_ITERATION_LINE = re.compile(r"^\s*(\d+)\s+-?\d")
+_NEWTON_ITERATION_LINE = re.compile(r"^\s*Iteration\s+(\d+)\.")
+
+
+def get_admin_token() -> Optional[str]:
+    """Get the admin token gating profiling from environment (unset disables profiling)"""
+    return os.getenv("PROFILING_ADMIN_TOKEN") or None
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """Check a request-supplied token against the profiling admin token"""
+    admin_token = get_admin_token()
+    if admin_token is None or token is None:
+        return False
+    return hmac.compare_digest(token.encode(), admin_token.encode())
+
+
+def is_enabled_flag(value: Optional[str]) -> bool:
+    """Interpret a header or query flag value as a boolean"""
+    return value is not None and value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def is_active() -> bool:
+    """Whether the current request is being profiled"""
+    return _current_profile.get() is not None
+
+
+@contextmanager
+def stage(name: str):
+    """Time a named stage of the current request if it is being profiled"""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.stages.append({
+            "stage": name,
+            "seconds": round(time.perf_counter() - start, 6)
+        })
+
+
+def record_stan_iterations(model) -> None:
+    """Record optimizer iterations of a fitted Prophet model for the current profile"""
+    profile = _current_profile.get()
+    if profile is None:
+        return
+    profile.stan_iterations.append(get_stan_iterations(model))
+
+
+def parse_stan_iterations(lines: Iterable[str]) -> Optional[int]:
+    """
+    Parse the optimizer iteration count from CmdStan console output
+
+    Understands both the L-BFGS/BFGS table (an `Iter` header followed by
+    numbered rows) and Newton output (`Iteration  N. ...` lines), which
+    Prophet uses for short series.
+
+    >>> parse_stan_iterations([
+    ...     "Initial log joint probability = -2.1",
+    ...     "    Iter      log prob        ||dx||      ||grad||       alpha",
+    ...     "      99       8432.2    0.00066       120.5      0.5232",
+    ...     "     147       8433.0   2.1e-08       0.0117           1",
+    ...     "Optimization terminated normally:",
+    ... ])
+    147
+    >>> parse_stan_iterations([
+    ...     "Initial log joint probability = -4.5",
+    ...     "Iteration  1. Log joint probability =    61.3702. Improved by 65.8.",
+    ...     "Iteration  2. Log joint probability =    98.0106. Improved by 36.6.",
+    ...     "Iteration 12. Log joint probability =    144.213. Improved by 1e-09.",
+    ... ])
+    12
+    >>> parse_stan_iterations(["no optimizer output"]) is None
+    True
+    """
+    iterations = None
+    in_table = False
+    for line in lines:
+        match = _NEWTON_ITERATION_LINE.match(line)
+        if match:
+            iterations = int(match.group(1))
+            continue
+        if _LBFGS_HEADER_LINE.match(line):
+            in_table = True
+            continue
+        match = _LBFGS_ITERATION_LINE.match(line) if in_table else None
+        if match:
+            iterations = int(match.group(1))
+    return iterations
+
+
+def get_stan_iterations(model) -> Optional[int]:
+    """
+    Read the number of Stan optimizer iterations from a fitted Prophet model
+
+    Parses the CmdStan console output kept by cmdstanpy. Returns None when
+    it is not available (e.g. a different Stan backend).
+    """
+    try:
+        stdout_files = model.stan_backend.stan_fit.runset.stdout_files
+        with open(stdout_files[0]) as f:
+            return parse_stan_iterations(f)
+    except Exception as e:
+        logger.debug(f"Stan iteration count unavailable: {str(e)}")
+        return None
+
+
+class RequestProfile:
+    """Profile of a single request; used as a context manager around its work"""
+
+    def __init__(self, label: str):
+        self.profile_id = uuid.uuid4().hex
+        self.label = label
+        self.created_at = datetime.utcnow()
+        self.stages: List[dict] = []
+        self.stan_iterations: List[Optional[int]] = []
+        self.total_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self._profiler = cProfile.Profile()
+        self._stats: Optional[pstats.Stats] = None
+        self._token = None
+        self._start = None
+
+    def __enter__(self) -> "RequestProfile":
+        self._token = _current_profile.set(self)
+        self._start = time.perf_counter()
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._profiler.disable()
+        self.total_seconds = round(time.perf_counter() - self._start, 6)
+        _current_profile.reset(self._token)
+        if exc is not None:
+            self.error = str(exc) or exc_type.__name__
+        self._stats = pstats.Stats(self._profiler)
+        self._profiler = None
+        profile_store.add(self)
+        logger.info(f"Stored profile {self.profile_id} for {self.label} ({self.total_seconds}s)")
+        return False
+
+    def stats_text(self, top: int = 40) -> str:
+        """Top functions by cumulative time, formatted by pstats"""
+        stream = io.StringIO()
+        stats = pstats.Stats(stream=stream)
+        stats.add(self._stats)
+        stats.sort_stats("cumulative").print_stats(top)
+        return stream.getvalue()
+
+    def stats_bytes(self) -> bytes:
+        """Raw profile in the pstats file format (loadable with pstats/snakeviz)"""
+        return marshal.dumps(self._stats.stats)
+
+    def to_dict(self, top: int = 40) -> dict:
+        return {
+            "profile_id": self.profile_id,
+            "label": self.label,
+            "created_at": self.created_at,
+            "total_seconds": self.total_seconds,
+            "stages": self.stages,
+            "stan_iterations": self.stan_iterations,
+            "error": self.error,
+            "cprofile": self.stats_text(top),
+        }
+
+
+class ProfileStore:
+    """Bounded in-memory store of recent request profiles"""
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size or int(os.getenv("PROFILE_STORE_SIZE", "20"))
+        self._profiles: "OrderedDict[str, RequestProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles[profile.profile_id] = profile
+            while len(self._profiles) > self.max_size:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[dict]:
+        with self._lock:
+            return [
+                {
+                    "profile_id": p.profile_id,
+                    "label": p.label,
+                    "created_at": p.created_at,
+                    "total_seconds": p.total_seconds,
+                    "error": p.error,
+                }
+                for p in reversed(self._profiles.values())
+            ]
+
+
+profile_store = ProfileStore()
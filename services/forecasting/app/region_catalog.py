@@ -0,0 +1,353 @@
+"""Region catalog: a maintained summary of region/disease series in MongoDB"""
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.collection import Collection
+from pymongo.database import Database
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+# Fields identifying a single forecastable series
+KEY_FIELDS = ("region", "district", "state", "disease")
+
+# Fields returned for each catalog entry
+CATALOG_FIELDS = KEY_FIELDS + ("latest_date", "case_count")
+
+# Meta document id holding the incremental sync watermark
+WATERMARK_ID = "cases"
+
+# Meta document id of the lease serializing full rebuilds across workers
+REBUILD_LEASE_ID = "rebuild_lease"
+
+# Changed series recomputed per aggregation during a sync
+SYNC_CHUNK_SIZE = 500
+
+
+def get_refresh_interval() -> float:
+    """Get seconds between background catalog refreshes from environment"""
+    return float(os.getenv("REGION_CATALOG_REFRESH_SECONDS", "60"))
+
+
+def get_rebuild_interval() -> float:
+    """Get seconds between full catalog rebuilds (which reconcile deletions)"""
+    return float(os.getenv("REGION_CATALOG_REBUILD_SECONDS", "3600"))
+
+
+def get_rebuild_lease() -> float:
+    """Get seconds a worker may hold the rebuild lease before it expires"""
+    return float(os.getenv("REGION_CATALOG_REBUILD_LEASE_SECONDS", "600"))
+
+
+def get_sync_overlap() -> float:
+    """Get seconds re-scanned before the watermark to catch late-committed writes"""
+    return float(os.getenv("REGION_CATALOG_SYNC_OVERLAP_SECONDS", "300"))
+
+
+class RegionCatalog:
+    """
+    Summary collection with one document per region/district/state/disease.
+
+    Each entry stores latest_date and case_count. The catalog is updated
+    incrementally from the cases' `updatedAt` timestamps, so a refresh only
+    touches series that changed since the previous sync instead of scanning
+    the whole cases collection. A periodic full rebuild reconciles deletions.
+    Refreshes run on a background thread; readers only query the catalog.
+    """
+
+    def __init__(self, db: Database, refresh_interval: Optional[float] = None):
+        self.cases_collection: Collection = db.cases
+        self.catalog_collection: Collection = db.region_catalog
+        self.meta_collection: Collection = db.region_catalog_meta
+        self.refresh_interval = (
+            get_refresh_interval() if refresh_interval is None else refresh_interval
+        )
+        self.rebuild_interval = get_rebuild_interval()
+        self.sync_overlap = get_sync_overlap()
+        self.rebuild_lease = get_rebuild_lease()
+        self._lease_holder = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    def ensure_indexes(self):
+        """Create the indexes backing case lookups and the catalog"""
+        # Serves fetch_historical_cases and per-series count/latest-date lookups
+        self.cases_collection.create_index(
+            [
+                ("region", ASCENDING),
+                ("district", ASCENDING),
+                ("state", ASCENDING),
+                ("disease", ASCENDING),
+                ("date", DESCENDING),
+            ],
+            name="series_date",
+        )
+        # Serves incremental catalog sync
+        self.cases_collection.create_index(
+            [("updatedAt", ASCENDING)],
+            name="updated_at",
+        )
+        self.catalog_collection.create_index(
+            [(field, ASCENDING) for field in KEY_FIELDS],
+            name="series_key",
+            unique=True,
+        )
+        self.catalog_collection.create_index(
+            [("disease", ASCENDING), ("region", ASCENDING), ("district", ASCENDING)],
+            name="disease_region_district",
+        )
+        self.catalog_collection.create_index(
+            [("state", ASCENDING), ("region", ASCENDING), ("district", ASCENDING)],
+            name="state_region_district",
+        )
+        logger.info("Region catalog indexes ensured")
+
+    def _get_meta(self) -> dict:
+        return self.meta_collection.find_one({"_id": WATERMARK_ID}) or {}
+
+    def _set_meta(self, **fields):
+        self.meta_collection.update_one(
+            {"_id": WATERMARK_ID},
+            {"$set": {**fields, "refreshed_at": datetime.utcnow()}},
+            upsert=True,
+        )
+
+    def _summary_pipeline(self, match: Optional[dict] = None) -> List[dict]:
+        """Aggregation computing latest_date, case_count and max updatedAt per series"""
+        pipeline = [{"$match": match}] if match else []
+        pipeline.append({
+            "$group": {
+                "_id": {field: f"${field}" for field in KEY_FIELDS},
+                "latest_date": {"$max": "$date"},
+                "case_count": {"$sum": 1},
+                "max_updated": {"$max": "$updatedAt"},
+            }
+        })
+        return pipeline
+
+    def _upsert_summaries(self, summaries, stamp: dict) -> Tuple[int, Optional[datetime]]:
+        """Write aggregated series summaries to the catalog"""
+        operations = []
+        synced_until = None
+        for entry in summaries:
+            operations.append(
+                UpdateOne(
+                    entry["_id"],
+                    {"$set": {
+                        "latest_date": entry["latest_date"],
+                        "case_count": entry["case_count"],
+                        **stamp,
+                    }},
+                    upsert=True,
+                )
+            )
+            max_updated = entry.get("max_updated")
+            if max_updated and (synced_until is None or max_updated > synced_until):
+                synced_until = max_updated
+
+        if operations:
+            self.catalog_collection.bulk_write(operations, ordered=False)
+        return len(operations), synced_until
+
+    def rebuild(self) -> int:
+        """
+        Rebuild the whole catalog with a single aggregation over the cases
+
+        Entries are upserted in place and entries not seen by this rebuild are
+        deleted afterwards, so readers never see an empty catalog. This is what
+        drops series whose cases were deleted and corrects counts after partial
+        deletes, which incremental syncs cannot observe.
+
+        Returns:
+            Number of catalog entries written
+        """
+        started_at = datetime.utcnow()
+        rebuild_id = uuid.uuid4().hex
+
+        written, synced_until = self._upsert_summaries(
+            self.cases_collection.aggregate(self._summary_pipeline(), allowDiskUse=True),
+            {"rebuild_id": rebuild_id, "synced_at": started_at},
+        )
+        # Entries written by a concurrent sync after this rebuild started are kept
+        removed = self.catalog_collection.delete_many({
+            "rebuild_id": {"$ne": rebuild_id},
+            "synced_at": {"$lt": started_at},
+        }).deleted_count
+        self._set_meta(synced_until=synced_until or started_at, rebuilt_at=started_at)
+
+        logger.info(f"Region catalog rebuilt with {written} entries ({removed} removed)")
+        return written
+
+    def sync(self) -> int:
+        """
+        Incrementally update catalog entries for series changed since the watermark
+
+        Changed series are found from cases whose `updatedAt` is newer than the
+        watermark minus a safety overlap (for writes committed late by concurrent
+        writers), then recomputed with one aggregation per chunk of series.
+        Deletions are only picked up by the periodic `rebuild`.
+
+        Returns:
+            Number of catalog entries updated
+        """
+        watermark = self._get_meta().get("synced_until")
+        if watermark is None:
+            return self.rebuild()
+
+        since = watermark - timedelta(seconds=self.sync_overlap)
+        changed_keys = [
+            entry["_id"]
+            for entry in self.cases_collection.aggregate([
+                {"$match": {"updatedAt": {"$gt": since}}},
+                {"$group": {"_id": {field: f"${field}" for field in KEY_FIELDS}}},
+            ])
+        ]
+
+        written = 0
+        synced_until = watermark
+        stamp = {"synced_at": datetime.utcnow()}
+        for start in range(0, len(changed_keys), SYNC_CHUNK_SIZE):
+            chunk = changed_keys[start:start + SYNC_CHUNK_SIZE]
+            count, chunk_until = self._upsert_summaries(
+                self.cases_collection.aggregate(self._summary_pipeline({"$or": chunk})),
+                stamp,
+            )
+            written += count
+            if chunk_until and chunk_until > synced_until:
+                synced_until = chunk_until
+
+        if written:
+            self._set_meta(synced_until=synced_until)
+            logger.info(f"Region catalog synced {written} changed entries")
+
+        return written
+
+    def _acquire_rebuild_lease(self) -> bool:
+        """
+        Take the shared rebuild lease so only one worker rebuilds at a time
+
+        The lease expires after the lease interval, so a worker that dies
+        mid-rebuild does not block rebuilds forever.
+        """
+        now = datetime.utcnow()
+        try:
+            self.meta_collection.find_one_and_update(
+                {
+                    "_id": REBUILD_LEASE_ID,
+                    "$or": [
+                        {"holder": self._lease_holder},
+                        {"expires_at": {"$lte": now}},
+                    ],
+                },
+                {"$set": {
+                    "holder": self._lease_holder,
+                    "expires_at": now + timedelta(seconds=self.rebuild_lease),
+                }},
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            # Another worker holds an unexpired lease
+            return False
+
+    def _release_rebuild_lease(self):
+        self.meta_collection.update_one(
+            {"_id": REBUILD_LEASE_ID, "holder": self._lease_holder},
+            {"$set": {"expires_at": datetime.utcnow()}},
+        )
+
+    def refresh(self):
+        """
+        Sync the catalog, or fully rebuild it when the last rebuild is older
+        than the rebuild interval and this worker obtains the rebuild lease
+        """
+        with self._lock:
+            rebuilt_at = self._get_meta().get("rebuilt_at")
+            rebuild_due = (
+                rebuilt_at is None
+                or datetime.utcnow() - rebuilt_at > timedelta(seconds=self.rebuild_interval)
+            )
+            if rebuild_due and self._acquire_rebuild_lease():
+                try:
+                    self.rebuild()
+                finally:
+                    self._release_rebuild_lease()
+            elif self._get_meta().get("synced_until") is not None:
+                self.sync()
+
+    def _refresh_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Region catalog refresh failed: {str(e)}")
+            self._stop_event.wait(self.refresh_interval)
+
+    def start_background_refresh(self):
+        """Keep the catalog up to date from a daemon thread, off the request path"""
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_loop, name="region-catalog-refresh", daemon=True
+        )
+        self._refresh_thread.start()
+        logger.info(f"Region catalog refresh running every {self.refresh_interval}s")
+
+    def stop_background_refresh(self, timeout: Optional[float] = 10.0):
+        """Stop the background refresh thread"""
+        self._stop_event.set()
+        if self._refresh_thread is not None:
+            self._refresh_thread.join(timeout)
+            self._refresh_thread = None
+
+    def list_regions(
+        self,
+        disease: Optional[str] = None,
+        state: Optional[str] = None,
+        region: Optional[str] = None,
+        min_cases: int = 0,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Tuple[List[dict], int]:
+        """
+        Query the catalog with filtering and pagination
+
+        Args:
+            disease: Optional disease filter
+            state: Optional state filter
+            region: Optional region filter
+            min_cases: Minimum number of case documents per series
+            limit: Maximum number of entries to return
+            offset: Number of entries to skip
+
+        Returns:
+            Tuple of (page of region dictionaries, total matching entries)
+        """
+        query = {}
+        if disease:
+            query["disease"] = disease
+        if state:
+            query["state"] = state
+        if region:
+            query["region"] = region
+        if min_cases:
+            query["case_count"] = {"$gte": min_cases}
+
+        total = self.catalog_collection.count_documents(query)
+        cursor = (
+            self.catalog_collection.find(
+                query,
+                projection={"_id": 0, **{field: 1 for field in CATALOG_FIELDS}},
+            )
+            .sort([("region", ASCENDING), ("district", ASCENDING)])
+            .skip(offset)
+            .limit(limit)
+        )
+        return list(cursor), total
@@ -0,0 +1,462 @@
+"""
+Load-test harness and capacity report for the forecasting service HTTP API
+
+Drives the real FastAPI app with configurable concurrency and request mix and
+reports throughput and p50/p95/p99 latency at each concurrency level.
+
+By default a single uvicorn worker is started in a subprocess, backed by an
+in-memory Mongo stand-in (mongomock) seeded with synthetic case data. Pass
+--url to target an already running service instead.
+
+Usage (from services/forecasting):
+    pip install -r requirements-loadtest.txt
+    python -m scripts.load_test --concurrency 1,2,4,8,16 --duration 20
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger("load_test")
+
+DISEASES = ["Dengue", "Malaria", "COVID-19", "Flu", "Cholera"]
+OPERATIONS = ("forecast", "forecast_inline", "batch", "regions")
+DEFAULT_MIX = "forecast=0.6,forecast_inline=0.2,batch=0.1,regions=0.1"
+FORECAST_HORIZONS = (7, 14, 30)
+REGIONS_PAGE_SIZE = 50
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parse a request mix such as 'forecast=0.7,batch=0.3' into weights"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown operation '{name}'. Choose from: {', '.join(OPERATIONS)}"
+            )
+        mix[name] = float(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("Request mix needs at least one positive weight")
+    return mix
+
+
+def parse_levels(value: str) -> List[int]:
+    """Parse a comma-separated list of concurrency levels"""
+    levels = sorted({int(level) for level in value.split(",") if level.strip()})
+    if not levels or levels[0] < 1:
+        raise argparse.ArgumentTypeError("Concurrency levels must be positive integers")
+    return levels
+
+
+def synthetic_history(rng: random.Random, days: int, end_date: datetime) -> List[dict]:
+    """Generate a daily case series with trend, weekly seasonality and noise"""
+    base = rng.uniform(5, 80)
+    trend = rng.uniform(-0.3, 0.8)
+    history = []
+    for i in range(days):
+        date = end_date - timedelta(days=days - 1 - i)
+        weekly = 1.0 + 0.15 * np.sin(2 * np.pi * date.weekday() / 7)
+        history.append({
+            "date": date,
+            "cases": max(0, int(rng.gauss((base + trend * i) * weekly, base * 0.15))),
+            "temperature": round(rng.uniform(18, 36), 1),
+            "humidity": round(rng.uniform(40, 95), 1),
+            "rainfall": round(rng.uniform(0, 30), 1),
+        })
+    return history
+
+
+def seed_cases(db, series: int, history_days: int, seed: int) -> int:
+    """Insert synthetic case documents shaped like the backend's Case model"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    end_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    documents = []
+    for i in range(series):
+        for point in synthetic_history(rng, history_days, end_date):
+            documents.append({
+                "region": f"Region-{i:03d}",
+                "district": f"District-{i:03d}",
+                "state": f"State-{i % 10:02d}",
+                "disease": DISEASES[i % len(DISEASES)],
+                "date": point["date"],
+                "newCases": point["cases"],
+                "temperature": point["temperature"],
+                "humidity": point["humidity"],
+                "rainfall": point["rainfall"],
+                "source": "loadtest",
+                "createdAt": now,
+                "updatedAt": now,
+            })
+
+    if documents:
+        db.cases.insert_many(documents)
+    return len(documents)
+
+
+def serve_with_mongo_stand_in(
+    port: int, series: int, history_days: int, seed: int, forecast_cache: bool = True
+):
+    """Run one uvicorn worker serving the app against a seeded mongomock database"""
+    if not forecast_cache:
+        # Read by ForecastService when app.main is imported below
+        os.environ["FORECAST_CACHE_SIZE"] = "0"
+
+    import mongomock
+    import uvicorn
+
+    from app import db as app_db
+
+    # Keep per-request service logs from flooding the report output
+    logging.getLogger().setLevel(logging.WARNING)
+
+    client = mongomock.MongoClient()
+    app_db._client = client
+    app_db._db = client["medsentinel"]
+    seed_cases(app_db._db, series, history_days, seed)
+
+    from app.main import app
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def find_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_service(client: "httpx.AsyncClient", timeout: float = 120.0):
+    """Poll /health until the service answers"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get("/health")
+            if response.status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"Service did not become healthy within {timeout:.0f}s")
+
+
+class LoadGenerator:
+    """Builds requests according to the mix and records their latencies"""
+
+    def __init__(
+        self,
+        client: "httpx.AsyncClient",
+        mix: Dict[str, float],
+        regions: List[dict],
+        regions_total: int,
+        batch_size: int,
+        history_days: int,
+        seed: int
+    ):
+        self.client = client
+        self.operations = [name for name, weight in mix.items() if weight > 0]
+        self.weights = [mix[name] for name in self.operations]
+        self.regions = regions
+        self.regions_total = regions_total
+        self.batch_size = batch_size
+        self.history_days = history_days
+        self.rng = random.Random(seed)
+
+    def _series_request(self) -> dict:
+        series = self.rng.choice(self.regions)
+        return {
+            "region": series["region"],
+            "district": series["district"],
+            "state": series["state"],
+            "disease": series["disease"],
+            "forecast_days": self.rng.choice(FORECAST_HORIZONS),
+            "historical_days": self.history_days,
+        }
+
+    def _inline_request(self) -> dict:
+        end_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        history = synthetic_history(self.rng, self.history_days, end_date)
+        for point in history:
+            point["date"] = point["date"].isoformat()
+        return {
+            "region": f"Inline-{self.rng.randrange(10 ** 6)}",
+            "district": "Synthetic",
+            "state": "Synthetic",
+            "disease": self.rng.choice(DISEASES),
+            "forecast_days": self.rng.choice(FORECAST_HORIZONS),
+            "historical_data": history,
+        }
+
+    def build(self, operation: str):
+        """Return (method, path, json body) for an operation"""
+        if operation == "forecast_inline" or (operation == "forecast" and not self.regions):
+            return "POST", "/forecast", self._inline_request()
+        if operation == "forecast":
+            return "POST", "/forecast", self._series_request()
+        if operation == "batch":
+            requests = [
+                self._series_request() if self.regions else self._inline_request()
+                for _ in range(self.batch_size)
+            ]
+            return "POST", "/forecast/batch", {"requests": requests}
+        offset = self.rng.randrange(0, max(self.regions_total, 1), REGIONS_PAGE_SIZE)
+        return "GET", f"/regions?limit={REGIONS_PAGE_SIZE}&offset={offset}", None
+
+    async def _worker(self, deadline: float, samples: List[tuple]):
+        while time.monotonic() < deadline:
+            operation = self.rng.choices(self.operations, weights=self.weights)[0]
+            method, path, body = self.build(operation)
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, path, json=body)
+                await response.aread()
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            samples.append((operation, time.perf_counter() - start, ok))
+
+    async def run_level(self, concurrency: int, duration: float) -> dict:
+        """Run `concurrency` closed-loop workers for `duration` seconds"""
+        samples: List[tuple] = []
+        deadline = time.monotonic() + duration
+        start = time.perf_counter()
+        await asyncio.gather(*(self._worker(deadline, samples) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+        result = {"concurrency": concurrency, **summarize(samples, elapsed)}
+        result["endpoints"] = {
+            operation: summarize([s for s in samples if s[0] == operation], elapsed)
+            for operation in self.operations
+        }
+        return result
+
+
+def summarize(samples: List[tuple], elapsed: float) -> dict:
+    """Throughput and latency percentiles for (operation, seconds, ok) samples"""
+    latencies_ms = np.array([seconds for _, seconds, ok in samples if ok]) * 1000
+    errors = sum(1 for _, _, ok in samples if not ok)
+
+    def percentile(q: float) -> Optional[float]:
+        return round(float(np.percentile(latencies_ms, q)), 2) if len(latencies_ms) else None
+
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(latencies_ms) / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(float(latencies_ms.mean()), 2) if len(latencies_ms) else None,
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+    }
+
+
+def capacity_summary(levels: List[dict], slo_ms: Optional[float]) -> dict:
+    """Derive peak throughput and the largest concurrency meeting the p95 SLO"""
+    peak = max(levels, key=lambda level: level["throughput_rps"])
+    summary = {
+        "cpu_count": os.cpu_count(),
+        "peak_throughput_rps": peak["throughput_rps"],
+        "peak_throughput_concurrency": peak["concurrency"],
+    }
+    if slo_ms is not None:
+        within_slo = [
+            level for level in levels
+            if level["p95_ms"] is not None and level["p95_ms"] <= slo_ms and not level["errors"]
+        ]
+        summary["p95_slo_ms"] = slo_ms
+        summary["max_concurrency_within_slo"] = (
+            max(level["concurrency"] for level in within_slo) if within_slo else None
+        )
+    return summary
+
+
+def format_report(report: dict) -> str:
+    """Render the capacity report as a plain-text table"""
+    def cell(value) -> str:
+        return "-" if value is None else str(value)
+
+    lines = [
+        f"Target: {report['target']}",
+        f"Mix: {report['mix']}  duration/level: {report['duration_seconds']}s",
+        "",
+        f"{'conc':>5} {'reqs':>7} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}",
+    ]
+    for level in report["levels"]:
+        lines.append(
+            f"{level['concurrency']:>5} {level['requests']:>7} {level['errors']:>5} "
+            f"{level['throughput_rps']:>9} {cell(level['p50_ms']):>9} "
+            f"{cell(level['p95_ms']):>9} {cell(level['p99_ms']):>9}"
+        )
+
+    if report["forecast_cache"] != "disabled" and (
+        report["mix"].get("forecast") or report["mix"].get("batch")
+    ):
+        lines += [
+            "",
+            f"Note: forecast cache {report['forecast_cache']}. 'forecast' and 'batch' requests "
+            f"reuse {report['series']} seeded series, so after warm-up they are mostly",
+            "cache hits, not model fits. Use --no-forecast-cache or the 'forecast_inline' "
+            "operation to measure fit capacity.",
+        ]
+
+    capacity = report["capacity"]
+    lines += [
+        "",
+        f"Peak throughput: {capacity['peak_throughput_rps']} req/s "
+        f"at concurrency {capacity['peak_throughput_concurrency']} "
+        f"(one worker; host has {capacity['cpu_count']} CPUs)",
+    ]
+    if "p95_slo_ms" in capacity:
+        lines.append(
+            f"Max concurrency with p95 <= {capacity['p95_slo_ms']} ms: "
+            f"{cell(capacity['max_concurrency_within_slo'])}"
+        )
+    return "\n".join(lines)
+
+
+async def run_load_test(args, base_url: str) -> dict:
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        await wait_for_service(client)
+
+        response = await client.get("/regions", params={"min_cases": 7, "limit": 1000})
+        body = response.json() if response.status_code == 200 else {}
+        regions = body.get("regions", [])
+        regions_total = body.get("total", len(regions))
+        if not regions:
+            logger.warning("No regions available; forecast requests will use inline data")
+
+        generator = LoadGenerator(
+            client, args.mix, regions, regions_total, args.batch_size, args.history_days, args.seed
+        )
+
+        if args.warmup > 0:
+            logger.info(f"Warming up for {args.warmup}s")
+            await generator.run_level(args.concurrency[0], args.warmup)
+
+        levels = []
+        for concurrency in args.concurrency:
+            logger.info(f"Running concurrency {concurrency} for {args.duration}s")
+            level = await generator.run_level(concurrency, args.duration)
+            logger.info(
+                f"concurrency={concurrency} rps={level['throughput_rps']} "
+                f"p50={level['p50_ms']}ms p95={level['p95_ms']}ms p99={level['p99_ms']}ms"
+            )
+            levels.append(level)
+
+    return {
+        "target": base_url,
+        "generated_at": datetime.now().isoformat(),
+        "mix": args.mix,
+        "duration_seconds": args.duration,
+        "batch_size": args.batch_size,
+        "series": len(regions),
+        "forecast_cache": forecast_cache_mode(args),
+        "levels": levels,
+        "capacity": capacity_summary(levels, args.slo_ms),
+    }
+
+
+def forecast_cache_mode(args) -> str:
+    """Describe whether the target's forecast path cache is in play"""
+    if args.url:
+        return "unknown"
+    return "disabled" if args.no_forecast_cache else "enabled"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Load-test the forecasting service and report capacity"
+    )
+    parser.add_argument("--url", help="Target a running service instead of starting a local worker")
+    parser.add_argument("--concurrency", type=parse_levels, default=parse_levels("1,2,4,8,16"),
+                        help="Comma-separated concurrency levels (default: 1,2,4,8,16)")
+    parser.add_argument("--duration", type=float, default=20.0,
+                        help="Seconds to run each concurrency level (default: 20)")
+    parser.add_argument("--warmup", type=float, default=5.0,
+                        help="Warm-up seconds before measuring (default: 5)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"Request mix weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--batch-size", type=int, default=10,
+                        help="Requests per /forecast/batch call (default: 10)")
+    parser.add_argument("--series", type=int, default=50,
+                        help="Synthetic region/disease series to seed locally (default: 50)")
+    parser.add_argument("--history-days", type=int, default=90,
+                        help="Days of history per series (default: 90)")
+    parser.add_argument("--timeout", type=float, default=120.0,
+                        help="Per-request timeout in seconds (default: 120)")
+    parser.add_argument("--slo-ms", type=float, default=None,
+                        help="p95 latency objective used in the capacity summary")
+    parser.add_argument("--no-forecast-cache", action="store_true",
+                        help="Disable the local worker's forecast path cache so every "
+                             "forecast fits a model (ignored with --url)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--output", help="Write the JSON capacity report to this file")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    args = build_parser().parse_args(argv)
+
+    if httpx is None:
+        logger.error("httpx is required: pip install -r requirements-loadtest.txt")
+        return 1
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        try:
+            import mongomock  # noqa: F401
+        except ImportError:
+            logger.error("mongomock is required for the local Mongo stand-in: "
+                         "pip install -r requirements-loadtest.txt")
+            return 1
+
+        port = find_free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = multiprocessing.Process(
+            target=serve_with_mongo_stand_in,
+            args=(port, args.series, args.history_days, args.seed, not args.no_forecast_cache),
+            daemon=True,
+        )
+        server.start()
+        logger.info(f"Started local worker (pid {server.pid}) on {base_url}")
+
+    try:
+        report = asyncio.run(run_load_test(args, base_url))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.join(timeout=10)
+
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Capacity report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())